@@ -4,27 +4,74 @@ Main cron job script for insider trading data pipeline.
 This script is designed to be run periodically by cron.
 """
 
+import atexit
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import logging
+from logging.handlers import QueueHandler, QueueListener
+import os
 from pathlib import Path
+import queue
 import sys
 import uuid
 from tickerCollections import tickerCollection
 from tickerDB import Database, BatchMetrics
+from tickerInfo import tickerInfo
 
 LOG_DIR = Path("/app/logging")
 LOG_DIR.mkdir(parents=True, exist_ok=True)
 
+# Number of tickers fetched concurrently (requests are network bound);
+# raise FETCH_WORKERS for large backfills instead of changing the code
+FETCH_WORKERS = int(os.getenv("FETCH_WORKERS", "8"))
+
+# Log calls only enqueue the record; a listener thread does the file/console
+# writes so per-ticker logging doesn't block the batch on I/O
+_log_queue = queue.SimpleQueue()
+_log_listener = QueueListener(
+    _log_queue,
+    logging.FileHandler(LOG_DIR / "cron.log"),
+    logging.StreamHandler()
+)
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s [%(levelname)s] %(message)s",
-    handlers=[
-        logging.FileHandler(LOG_DIR / "cron.log"),
-        logging.StreamHandler()
-    ]
+    handlers=[QueueHandler(_log_queue)]
 )
+_log_listener.start()
+# Flush whatever is still queued when sys.exit ends the run
+atexit.register(_log_listener.stop)
 
 logger = logging.getLogger(__name__)
 
+def fetch(pool, listData, fetcher):
+    """
+    Run a tickerInfo fetch method for every ticker on the thread pool.
+    Workers only hit the APIs; all DB work stays on the main thread.
+    Returns the tickers that fetched cleanly and (ticker, error) pairs for the rest.
+    """
+    futures = {pool.submit(fetcher, data): data for data in listData}
+    fetched = []
+    failed = []
+    for future in as_completed(futures):
+        data = futures[future]
+        try:
+            future.result()
+            fetched.append(data)
+        except Exception as e:
+            failed.append((data, e))
+    return fetched, failed
+
+def record_error(db, metrics, batch_id, data, e):
+    """Log a per-ticker failure without aborting the batch"""
+    logger.error(f"Error: {str(e)}")
+    metrics.increment_error()
+    db.errors.log_error(
+        batch_id,
+        f"Error processing {data.symbol}",
+        str(e),
+        {"symbol": data.symbol}
+    )
+
 def main():
     """
     Main execution function for the insider trading data pipeline.
@@ -32,6 +79,13 @@ def main():
     and stores everything in PostgreSQL.
     """
 
+    try:
+        # Fail before spending API quota if Postgres is unreachable
+        Database.check()
+    except Exception as e:
+        logger.error(f"Fatal DB error: {str(e)}")
+        sys.exit(1)
+
     try:
         logger.info("Starting insider trading data pipeline...")
         batch_id = str(uuid.uuid4())
@@ -40,7 +94,7 @@ def main():
         metrics.start()
 
         # Initialize data collection
-        with metrics.time_operation('time_to_fetch_trades'):
+        with metrics.time_fetch_trades():
             collection = tickerCollection()
             listData = collection.tickerList
 
@@ -50,55 +104,103 @@ def main():
         sys.exit(1)
 
     try:
+        # The whole batch is one transaction, committed when the block exits; each
+        # ticker's writes run under a savepoint so one failure doesn't abort the rest
         with Database() as db:
             logger.info("Database connection established")
 
-            for data in listData:
-                logger.info(f"Processing {data.symbol}")
+            # Repeats inside the FMP page are dropped in one vectorized pass, then
+            # trades stored recently are dropped with one set lookup each
+            unique_trades = collection.uniqueTrades()
+            with metrics.time_db():
+                known = db.load_recent_hashes()
+            seen_trades = [data for data in unique_trades if data.record_hash in known]
+            unique_trades = [data for data in unique_trades if data.record_hash not in known]
+            metrics.add_duplicate_trade(len(listData) - len(unique_trades))
+
+            # The filtered repeats skip insert_many, so refresh their last_seen_at here
+            try:
+                with metrics.time_db(), db.savepoint():
+                    db.tickers.refresh_seen(seen_trades, batch_id)
+            except Exception as e:
+                logger.error(f"Error refreshing seen trades: {str(e)}")
+                metrics.increment_error()
+                db.errors.log_error(batch_id, "Error refreshing seen trades", str(e), {"trades": len(seen_trades)})
+
+            # Dedup first so no API calls are spent on trades we already have;
+            # one INSERT ... RETURNING tells us which trades are new
+            new_trades = []
+            try:
+                with metrics.time_db(), db.savepoint():
+                    new_hashes = db.tickers.insert_many(unique_trades, batch_id)
+                new_trades = [data for data in unique_trades if data.record_hash in new_hashes]
+                metrics.add_duplicate_trade(len(unique_trades) - len(new_trades))
+            except Exception as e:
+                logger.error(f"Error inserting trade batch: {str(e)}")
+                metrics.increment_error()
+                db.errors.log_error(batch_id, "Error inserting trade batch", str(e), {"trades": len(unique_trades)})
+
+            # Timed around the pool so the metrics reflect the overlapped wall time.
+            # Prices are prefetched in one batch; getPriceData only runs for the misses.
+            with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as pool:
+                with metrics.time_fetch_price():
+                    collection.prefetchPriceData(new_trades)
+                    priced, price_failures = fetch(pool, new_trades, tickerInfo.getPriceData)
+                with metrics.time_fetch_options():
+                    fetched, options_failures = fetch(pool, priced, tickerInfo.getOptionsData)
+
+            for data, e in price_failures + options_failures:
+                record_error(db, metrics, batch_id, data, e)
+
+            # Pricing and options rows from every trade are flushed together after the loop
+            pricing_rows = []
+            options_rows = []
+            for data in fetched:
                 try:
-                    with metrics.time_operation('db_operation_time_seconds'):
-                        is_new = db.tickers.insert(data, batch_id)
-
-                    if not is_new:
-                        metrics.add_duplicate_trade()
-                        continue
-
-                    with metrics.time_operation('time_to_fetch_price'):
-                        data.getPriceData()
+                    prices = data.priceData
+                    has_pricing = False
 
-                    has_pricing = data.priceData is not None and not data.priceData.empty
+                    if prices is not None and not prices.empty:
+                        has_pricing = True
+                        rows = db.pricing.build_rows(prices, data)
+                        pricing_rows.extend(rows)
+                        metrics.pricing_records_inserted += len(rows)
 
-                    if has_pricing:
-                        with metrics.time_operation('db_operation_time_seconds'):
-                            db.pricing.insert(data.priceData, data)
-                        metrics.pricing_records_inserted += len(data.priceData)
+                    options = data.optionsData
+                    has_options = False
 
-                    with metrics.time_operation('time_to_fetch_options'):
-                        data.getOptionsData()
-
-                    has_options = data.optionsData is not None and not data.optionsData.empty
-
-                    if has_options:
-                        with metrics.time_operation('db_operation_time_seconds'):
-                            db.options.insert(data.optionsData, data)
-                        metrics.options_records_inserted += len(data.optionsData)
+                    if options is not None and not options.empty:
+                        has_options = True
+                        rows = db.options.build_rows(options, data)
+                        options_rows.extend(rows)
+                        metrics.options_records_inserted += len(rows)
 
                     metrics.add_ticker_processed(
-                        inserted=is_new,
+                        inserted=True,
                         had_pricing=has_pricing,
                         had_options=has_options
                     )
-                    logger.info(f"Processed (pricing: {has_pricing}, options: {has_options})")
+                    logger.info(f"Processed {data.symbol} (pricing: {has_pricing}, options: {has_options})")
 
                 except Exception as e:
-                    logger.error(f"Error: {str(e)}")
-                    metrics.increment_error()
-                    db.errors.log_error(
-                        batch_id,
-                        f"Error processing {data.symbol}",
-                        str(e),
-                        {"symbol": data.symbol}
-                    )
+                    record_error(db, metrics, batch_id, data, e)
+
+            try:
+                with metrics.time_db(), db.savepoint():
+                    db.pricing.insert_rows(pricing_rows)
+            except Exception as e:
+                logger.error(f"Error inserting pricing batch: {str(e)}")
+                metrics.increment_error()
+                metrics.pricing_records_inserted = 0
+                db.errors.log_error(batch_id, "Error inserting pricing batch", str(e), {"rows": len(pricing_rows)})
+            try:
+                with metrics.time_db(), db.savepoint():
+                    db.options.insert_rows(options_rows)
+            except Exception as e:
+                logger.error(f"Error inserting options batch: {str(e)}")
+                metrics.increment_error()
+                metrics.options_records_inserted = 0
+                db.errors.log_error(batch_id, "Error inserting options batch", str(e), {"rows": len(options_rows)})
             success = metrics.error_count == 0
             metrics.complete(success=success)
             metrics.api_call_time_seconds = (
@@ -0,0 +1,61 @@
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from tickerConverter import CSVDataManager, _queue_write, flush_writes
+
+
+def price_frame():
+    index = pd.DatetimeIndex(["2025-01-02", "2025-01-03"], name="Date")
+    return pd.DataFrame({"Close": [3.0, 4.25], "Volume": [100, 200]}, index=index)
+
+
+def options_frame():
+    # Market Data columns can mix types or hold lists, which Arrow can't type as one column
+    return pd.DataFrame({"optionSymbol": ["A", "B"], "mixed": [1, "x"], "legs": [[1, 2], None]})
+
+
+def test_price_csv_matches_to_csv_output(tmp_path):
+    df = price_frame()
+    path = tmp_path / "AAPL.csv"
+    CSVDataManager(tmp_path)._write_frame(df, path, index_label="Date")
+    # What download_price_data wrote before pyarrow: reset_index + to_csv
+    assert path.read_text() == df.reset_index().to_csv(index=False)
+
+
+def test_options_csv_matches_to_csv_output(tmp_path):
+    df = options_frame()
+    path = tmp_path / "AAPL.csv"
+    CSVDataManager(tmp_path)._write_frame(df, path)
+    assert path.read_text() == df.to_csv(index=False)
+
+
+def test_parquet_round_trips_prices_with_dates(tmp_path):
+    path = tmp_path / "AAPL.parquet"
+    CSVDataManager(tmp_path)._write_frame(price_frame(), path, index_label="Date")
+    table = pq.read_table(path)
+    assert table.column_names == ["Date", "Close", "Volume"]
+    assert str(table.schema.field("Date").type) == "date32[day]"
+    assert table.column("Close").to_pylist() == [3.0, 4.25]
+
+
+def test_parquet_stores_mixed_object_columns_as_text(tmp_path):
+    path = tmp_path / "AAPL.parquet"
+    CSVDataManager(tmp_path)._write_frame(options_frame(), path)
+    table = pq.read_table(path)
+    assert table.column("mixed").to_pylist() == ["1", "x"]
+    assert table.column("legs").to_pylist() == ["[1, 2]", None]
+
+
+def test_flush_writes_reports_each_failure_once(tmp_path):
+    def fail(df, path):
+        raise OSError("disk full")
+
+    _queue_write(fail, price_frame(), tmp_path / "bad.csv", "rows")
+    with pytest.raises(Exception, match="disk full"):
+        flush_writes()
+
+    manager = CSVDataManager(tmp_path)
+    _queue_write(manager._write_frame, price_frame(), tmp_path / "good.csv", "rows")
+    flush_writes()
+    assert (tmp_path / "good.csv").exists()
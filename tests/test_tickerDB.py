@@ -0,0 +1,88 @@
+from datetime import date
+
+import pytest
+
+from tickerDB import InsiderTradingPricingRecords, InsiderTradingRecords
+from tickerInfo import tickerInfo
+
+TRADE = {
+    "symbol": "AAPL",
+    "disclosureDate": "2025-02-01",
+    "transactionDate": "2025-01-15",
+    "firstName": "Jane",
+    "lastName": "Doe",
+    "type": "Purchase",
+    "amount": "$1,001 - $15,000",
+    "owner": "Self",
+    "assetType": "Stock",
+}
+
+# Parameter positions in InsiderTradingRecords._row, matching the INSERT column list
+TRANSACTION_DATE = 2
+DISCLOSURE_DATE = 9
+
+
+def row_for(**fields):
+    return InsiderTradingRecords(None, None)._row(tickerInfo({**TRADE, **fields}), None)
+
+
+def test_row_binds_transaction_date_as_date():
+    assert row_for()[TRANSACTION_DATE] == date(2025, 1, 15)
+
+
+@pytest.mark.parametrize("value", ["", "2025-13-01", "N/A", None])
+def test_row_binds_unparseable_transaction_date_as_null(value):
+    assert row_for(transactionDate=value)[TRANSACTION_DATE] is None
+
+
+def test_row_binds_disclosure_date_as_date():
+    assert row_for()[DISCLOSURE_DATE] == date(2025, 2, 1)
+
+
+@pytest.mark.parametrize("value", ["", "2025-13-01", "N/A", None])
+def test_row_binds_unparseable_disclosure_date_as_null(value):
+    assert row_for(disclosureDate=value)[DISCLOSURE_DATE] is None
+
+
+class RecordingCursor:
+    def __init__(self):
+        self.statements = []
+        self.params = []
+        self.rowcount = 0
+
+    def execute(self, sql, params=None):
+        self.statements.append(sql)
+        self.params.append(params)
+
+
+def test_ensure_partitions_reissues_ddl_after_a_rollback(monkeypatch):
+    monkeypatch.setattr(InsiderTradingPricingRecords, "partitioned", True)
+    cursor = RecordingCursor()
+    pricing = InsiderTradingPricingRecords(cursor, None)
+    rows = [("AAPL", b"", "2025-01-15"), ("AAPL", b"", "2025-02-03")]
+
+    pricing.ensure_partitions(rows)
+    # A rolled-back load takes its partitions with it, so the next load must not skip them
+    pricing.ensure_partitions(rows)
+
+    assert len(cursor.statements) == 2
+    for sql in cursor.statements:
+        assert "InsiderTradingPricingRecords_2025_01" in sql
+        assert "InsiderTradingPricingRecords_2025_02" in sql
+
+
+def test_refresh_seen_updates_filtered_repeats_in_one_statement():
+    cursor = RecordingCursor()
+    trade = tickerInfo(TRADE)
+
+    InsiderTradingRecords(cursor, None).refresh_seen([trade, tickerInfo(TRADE)], "batch")
+
+    assert len(cursor.statements) == 1
+    assert "last_seen_at = NOW()" in cursor.statements[0]
+    assert cursor.params[0] == ("batch", [trade.record_digest], "batch")
+
+
+def test_refresh_seen_skips_the_round_trip_when_nothing_was_filtered():
+    cursor = RecordingCursor()
+    assert InsiderTradingRecords(cursor, None).refresh_seen([], "batch") == 0
+    assert cursor.statements == []
@@ -0,0 +1,59 @@
+import matplotlib
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+import pytest
+
+from tickerConverter import CSVDataManager
+from tickerInfo import _GRAPH_FIGURE, tickerInfo
+
+TRADE = {
+    "symbol": "AAPL",
+    "disclosureDate": "2025-01-03",
+    "transactionDate": "2025-01-02",
+    "firstName": "Jane",
+    "lastName": "Doe",
+    "type": "Purchase",
+}
+
+
+@pytest.fixture
+def pricing_csv(tmp_path, monkeypatch):
+    monkeypatch.setattr(tickerInfo, "csv_manager", CSVDataManager(tmp_path))
+    path = tmp_path / "AAPL.csv"
+    path.write_text("Date,Close\n2025-01-02,3.0\n2025-01-03,4.0\n")
+    return path
+
+
+def test_generate_graphs_writes_a_png_per_trade(pricing_csv):
+    data = tickerInfo(TRADE)
+    data.generateGraphs(pricing_csv)
+    assert (pricing_csv.parent / "graphs" / f"AAPL_{data.record_hash[:12]}.png").exists()
+    assert not plt.figure(_GRAPH_FIGURE).gca().lines
+
+
+def test_generate_graphs_clears_the_shared_figure_when_saving_fails(pricing_csv, monkeypatch):
+    def fail(self, *args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(Figure, "savefig", fail)
+    with pytest.raises(OSError):
+        tickerInfo(TRADE).generateGraphs(pricing_csv)
+    # Nothing from the failed trade may leak into the next trade's graph
+    assert not plt.figure(_GRAPH_FIGURE).gca().lines
+
+
+def test_generate_graphs_plots_close_with_both_date_markers(pricing_csv, monkeypatch):
+    labels = []
+
+    def record(self, *args, **kwargs):
+        labels.extend(line.get_label() for line in self.gca().lines)
+
+    monkeypatch.setattr(Figure, "savefig", record)
+    tickerInfo(TRADE).generateGraphs(pricing_csv)
+    assert labels == [
+        "Close Price",
+        "Transaction Date (2025-01-02)",
+        "Disclosure Date (2025-01-03)",
+    ]
@@ -1,36 +1,112 @@
 #!/usr/bin/env python3
 
+from logging import getLogger
+import orjson
 import requests
 import os
-from tickerInfo import tickerInfo
+import pandas as pd
+import yfinance as yf
+from tickerConverter import download_lock
+from tickerInfo import tickerInfo, HASH_FIELDS
+from tickerSession import SESSION, TIMEOUT
+
+# curl "https://financialmodelingprep.com/stable/house-latest?page=0&limit=10&apikey=$FMP_API_KEY" | jq > house.json
+_FMP_URL = "https://financialmodelingprep.com/stable/house-latest"
+# The API key is read per request, so it can be set after this module is imported
+_FMP_PARAMS = {
+    "page":0,
+    "limit":10
+}
+log = getLogger(__name__)
+# Most symbols per batched yf.download request
+PREFETCH_CHUNK = 20
 
 class tickerCollection:
     def __init__(self):
-        self.tickerList = self.getPoliticianTransactionData()
         self.politicianTransactionData = None
         self.optionsAPIResponse = None
+        # Columnar copy of the batch, row-aligned with tickerList
+        self.trades_df: pd.DataFrame = pd.DataFrame()
+        self.tickerList = self.getPoliticianTransactionData()
 
     def getPoliticianTransactionData(self):
-        # curl "https://financialmodelingprep.com/stable/house-latest?page=0&limit=10&apikey=$FMP_API_KEY" | jq > house.json
-        url= "https://financialmodelingprep.com/stable/house-latest"
-        params= {
-            "page":0,
-            "limit":10,
-            "apikey":os.getenv('FMP_API_KEY')
-        }
+        url = _FMP_URL
+        api_key = os.getenv('FMP_API_KEY')
+        if not api_key:
+            raise Exception("FMP_API_KEY is not set")
         try:
-            self.politicianTransactionData = requests.get(url, params=params, timeout=15)
-        except requests.exceptions.Timeout:
-            raise Exception(f"Request to {url} timed out after 15 seconds")
+            # Retries and backoff happen in the session's adapter
+            self.politicianTransactionData = SESSION.get(url, params={**_FMP_PARAMS, "apikey": api_key}, timeout=TIMEOUT)
         except requests.exceptions.RequestException as e:
-            raise Exception(f"Request to {url} failed: {str(e)}")
-
-        jsonData = self.politicianTransactionData.json()
-        listData = []
-        for data in jsonData:
-            listData.append(tickerInfo(data))
-        return listData
-    
+            raise Exception(f"Request to {url} failed after retries: {str(e)}")
+
+        # orjson parses straight from the response bytes, skipping the text decode
+        jsonData = orjson.loads(self.politicianTransactionData.content)
+        self.trades_df = pd.DataFrame(jsonData)
+        return tickerInfo.from_records(jsonData)
+
+    def uniqueTrades(self):
+        """
+        Return tickerList without trades repeated inside this batch.
+        Uses the record_hash fields, so it agrees with the DB's dedup.
+        """
+        if self.trades_df.empty:
+            return list(self.tickerList)
+        duplicated = self.trades_df.reindex(columns=list(HASH_FIELDS)).duplicated().to_numpy()
+        return [data for data, is_dup in zip(self.tickerList, duplicated) if not is_dup]
+
+    def prefetchPriceData(self, tickers=None):
+        """
+        Download pricing for many tickers with batched yf.download calls.
+        Trades are ordered by window start and split into requests of at most
+        PREFETCH_CHUNK symbols, so each request spans a tighter date range.
+        Each tickerInfo gets its own window sliced out of its chunk's frame;
+        tickers that come back empty are left for getPriceData to fetch.
+        """
+        if tickers is None:
+            tickers = self.tickerList
+        windows = {}
+        for data in tickers:
+            try:
+                windows[data] = data.getPriceWindow()
+            except Exception:
+                # getPriceData raises the same error for this ticker later
+                continue
+
+        chunk = {}
+        symbols = set()
+        for data, window in sorted(windows.items(), key=lambda item: item[1]):
+            if data.symbol not in symbols and len(symbols) == PREFETCH_CHUNK:
+                self._prefetchChunk(chunk, symbols)
+                chunk, symbols = {}, set()
+            chunk[data] = window
+            symbols.add(data.symbol)
+        if chunk:
+            self._prefetchChunk(chunk, symbols)
+
+    def _prefetchChunk(self, windows, symbols):
+        """One yf.download for a chunk of trades, sliced back onto each trade"""
+        start = min(start for start, _ in windows.values())
+        end = max(end for _, end in windows.values())
+        try:
+            with download_lock:
+                result = yf.download(" ".join(sorted(symbols)), start=start, end=end, group_by='ticker',
+                                     threads=True, progress=False, timeout=15)
+        except Exception as e:
+            log.warning("Batched price download failed, falling back to per ticker requests: %s", e)
+            return
+
+        downloaded = set(result.columns.get_level_values(0)) if isinstance(result.columns, pd.MultiIndex) else set()
+        for data, (start, end) in windows.items():
+            if data.symbol not in downloaded:
+                continue
+            # yfinance treats end as exclusive, so slice the same way
+            frame = result[data.symbol]
+            in_window = (frame.index >= pd.Timestamp(start)) & (frame.index < pd.Timestamp(end))
+            # .loc keeps the boolean-mask selection typed as a DataFrame
+            frame = frame.loc[in_window].dropna(how='all')
+            if not frame.empty:
+                data.priceData = frame
 
 if __name__ == "__main__":
     collection = tickerCollection()
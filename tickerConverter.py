@@ -1,13 +1,121 @@
 #!/usr/bin/env python3
 # documentation: libraries https://github.com/ranaroussi/yfinance
+from __future__ import annotations
+
 import argparse
+import atexit
 import sys
 from pathlib import Path
 from io import StringIO
 import contextlib
-
-import yfinance as yf
-import pandas as pd
+import functools
+from logging import INFO, basicConfig, getLogger
+import queue
+import threading
+from typing import TYPE_CHECKING
+
+# yfinance, pandas and pyarrow are imported where they are used, so the CLI's
+# --help and argument errors don't pay for loading them
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+log = getLogger(__name__)
+
+# yf.download keeps its results in module-level state, so concurrent batched downloads
+# must not overlap (see tickerCollection.prefetchPriceData); per-ticker fetches below
+# go through yf.Ticker, which has no shared download state and needs no lock
+download_lock = threading.Lock()
+# Process-local cache of downloaded history, keyed on (ticker, start, end)
+_PRICE_CACHE: dict[tuple, pd.DataFrame] = {}
+
+def fetch_price_history(ticker: str, start: str | None = None, end: str | None = None,
+                        timeout: int = 15) -> pd.DataFrame:
+    """
+    Download one ticker's daily price history, memoized per (ticker, start, end)
+
+    Uses yf.Ticker(...).history so fetches on different threads run concurrently.
+    Trades for the same symbol and window reuse the first download instead of
+    re-requesting Yahoo. Callers get a copy, so they are free to mutate it.
+    """
+    import pandas as pd
+    import yfinance as yf
+
+    key = (ticker.upper(), start, end)
+    cached = _PRICE_CACHE.get(key)
+    if cached is not None:
+        return cached.copy()
+
+    # Same frame yf.download gave: OHLCV only and the whole history when no start is given
+    data = yf.Ticker(ticker).history(start=start, end=end, period=None if start else "max",
+                                     actions=False, timeout=timeout)
+    if isinstance(data.index, pd.DatetimeIndex) and data.index.tz is not None:
+        # history() returns exchange-local timestamps; yf.download's daily bars are naive dates
+        data.index = data.index.tz_localize(None)
+    if not data.empty:
+        _PRICE_CACHE[key] = data
+    return data.copy()
+
+
+# Completed frames are written by one background thread so callers don't block on disk
+_WRITE_Q: queue.Queue = queue.Queue()
+_WRITE_ERRORS: list[Exception] = []
+_writer_thread: threading.Thread | None = None
+_writer_lock = threading.Lock()
+
+def _writer_loop():
+    """Drain the write queue for the lifetime of the process"""
+    while True:
+        write, df, output_path, label = _WRITE_Q.get()
+        try:
+            write(df, output_path)
+            log.info("Saved %d %s to %s", len(df), label, output_path)
+        except Exception as e:
+            error = Exception(f"Error writing {output_path}: {e}")
+            with _writer_lock:
+                _WRITE_ERRORS.append(error)
+            log.error("%s", error)
+        finally:
+            _WRITE_Q.task_done()
+
+def _queue_write(write, df: pd.DataFrame, output_path: Path, label: str):
+    """Hand a frame to the writer thread, starting it on first use"""
+    global _writer_thread
+    with _writer_lock:
+        if _writer_thread is None:
+            _writer_thread = threading.Thread(target=_writer_loop, name="csv-writer", daemon=True)
+            _writer_thread.start()
+            atexit.register(_WRITE_Q.join)
+    _WRITE_Q.put((write, df, output_path, label))
+
+def flush_writes():
+    """
+    Block until every queued file is on disk; raises the first write error if any failed
+    Errors are handed out once: a later flush only reports writes that failed after this one.
+    """
+    _WRITE_Q.join()
+    with _writer_lock:
+        errors = _WRITE_ERRORS[:]
+        _WRITE_ERRORS.clear()
+    if errors:
+        raise errors[0]
+
+
+@functools.lru_cache(maxsize=None)
+def _make_dir(directory: Path) -> Path:
+    """mkdir -p, at most once per directory per process"""
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory
+
+@functools.lru_cache(maxsize=1024)
+def _sanitize_ticker(ticker: str) -> str:
+    """Filename-safe ticker, memoized since the same symbols recur across a run"""
+    return ticker.upper().replace('/', '_')
+
+@functools.lru_cache(maxsize=1024)
+def _ticker_file(directory: Path, ticker: str, suffix: str) -> Path:
+    """Memoized directory / TICKER{suffix} path"""
+    return directory / f"{_sanitize_ticker(ticker)}{suffix}"
 
 
 class CSVDataManager:
@@ -28,31 +136,30 @@ class CSVDataManager:
 
     def _ensure_dir(self, directory: Path) -> Path:
         """Ensure a directory exists, create if it doesn't"""
-        directory.mkdir(parents=True, exist_ok=True)
-        return directory
+        # Folders are created on first write, not at construction: the module-level
+        # managers are built at import and importing must not touch the filesystem
+        return _make_dir(directory)
 
-    def _sanitize_ticker(self, ticker: str) -> str:
+    @staticmethod
+    def _sanitize_ticker(ticker: str) -> str:
         """Sanitize ticker symbol for use in filenames"""
-        return ticker.upper().replace('/', '_')
+        return _sanitize_ticker(ticker)
 
     def _get_pricing_path(self, ticker: str, custom_output: str | None = None) -> Path:
         """Get the output path for pricing data"""
         if custom_output:
             return Path(custom_output)
-        self._ensure_dir(self.pricing_dir)
-        return self.pricing_dir / f"{self._sanitize_ticker(ticker)}.csv"
+        return _ticker_file(self._ensure_dir(self.pricing_dir), ticker, ".csv")
 
     def _get_options_path(self, ticker: str, custom_output: str | None = None) -> Path:
         """Get the output path for options data"""
         if custom_output:
             return Path(custom_output)
-        self._ensure_dir(self.options_dir)
-        return self.options_dir / f"{self._sanitize_ticker(ticker)}.csv"
+        return _ticker_file(self._ensure_dir(self.options_dir), ticker, ".csv")
 
     def _get_error_path(self, ticker: str) -> Path:
         """Get the output path for error HTML files"""
-        self._ensure_dir(self.errors_dir)
-        return self.errors_dir / f"{self._sanitize_ticker(ticker)}_error.html"
+        return _ticker_file(self._ensure_dir(self.errors_dir), ticker, "_error.html")
 
     def _save_html_error(self, ticker: str, html_content: str) -> Path:
         """Save HTML error content to a file"""
@@ -62,8 +169,48 @@ class CSVDataManager:
         print(f"HTML error saved to {error_file}")
         return error_file
 
+    def _save_if_html_error(self, ticker: str, stderr_output: str) -> Path | None:
+        """Save captured stderr as an HTML error file if it contains an HTML page"""
+        # HTML signatures appear in the first few KB, so only lowercase that much
+        head = stderr_output[:4096].lower()
+        if '<html' in head or '<!doctype' in head:
+            return self._save_html_error(ticker, stderr_output)
+        return None
+
+    def _write_frame(self, df: pd.DataFrame, output_path: Path, index_label: str | None = None):
+        """
+        Write a DataFrame as CSV, or as Parquet for .parquet paths
+        index_label writes the index as the leading column under that name.
+        CSV stays on to_csv so files match earlier runs byte for byte (pyarrow's CSV
+        writer quotes the header and prints 3.0 as 3); Parquet goes through pyarrow.
+        """
+        if output_path.suffix != '.parquet':
+            df.to_csv(output_path, index=index_label is not None, index_label=index_label)
+            return
+
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        frame = df.rename_axis(index_label).reset_index() if index_label else df
+        try:
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # Object columns mixing types (options chains can) have no Arrow type;
+            # store them as text, the way the CSV would, keeping missing values null
+            text = {column: frame[column].map(lambda value: value if value is None else str(value))
+                    for column in frame.select_dtypes(include='object').columns}
+            table = pa.Table.from_pandas(frame.assign(**text), preserve_index=False)
+        # Daily bars are midnight timestamps; store them as plain dates like the CSV does
+        for column in frame.select_dtypes(include='datetime').columns:
+            if (frame[column] == frame[column].dt.normalize()).all():
+                index = table.schema.get_field_index(str(column))
+                table = table.set_column(index, str(column), table[str(column)].cast(pa.date32()))
+        pq.write_table(table, output_path)
+
     def download_price_data(self, ticker: str, start: str | None = None,
-                           end: str | None = None, output: str | None = None) -> Path:
+                           end: str | None = None, output: str | None = None,
+                           timeout: int = 15, file_format: str = "csv",
+                           write_csv: bool = True) -> Path | pd.DataFrame:
         """
         Download historical price data from Yahoo Finance and save to CSV
 
@@ -72,54 +219,42 @@ class CSVDataManager:
             start: Start date in YYYY-MM-DD format
             end: End date in YYYY-MM-DD format
             output: Optional custom output path
+            timeout: Seconds to wait on each Yahoo request
+            file_format: "csv" or "parquet"
+            write_csv: False skips the file and returns the DataFrame instead
 
         Returns:
-            Path to saved CSV file
+            Path the file is written to (see flush_writes), or the DataFrame when write_csv is False
         """
         output_path = self._get_pricing_path(ticker, output)
-
-        # Build the yfinance call
-        kwargs = {}
-        if start:
-            kwargs["start"] = start
-        if end:
-            kwargs["end"] = end
+        if file_format == "parquet":
+            output_path = output_path.with_suffix('.parquet')
 
         # Capture stderr to save HTML errors from yfinance
         stderr_capture = StringIO()
 
+        download_error = None
         try:
             with contextlib.redirect_stderr(stderr_capture):
-                data = yf.download(ticker, **kwargs, progress=False)
+                data = fetch_price_history(ticker, start, end, timeout)
         except Exception as e:
-            # Check captured stderr for HTML before re-raising
-            stderr_output = stderr_capture.getvalue()
-            if stderr_output and ('<html' in stderr_output.lower() or '<!doctype' in stderr_output.lower()):
-                self._save_html_error(ticker, stderr_output)
-            raise Exception(f"Error downloading data for {ticker}: {e}")
+            download_error = e
 
-        # Also check stderr for HTML even if no exception (some errors don't raise)
-        stderr_output = stderr_capture.getvalue()
-        if stderr_output and ('<html' in stderr_output.lower() or '<!doctype' in stderr_output.lower()):
-            self._save_html_error(ticker, stderr_output)
+        # Check stderr for HTML whether or not the download raised (some errors don't)
+        self._save_if_html_error(ticker, stderr_capture.getvalue())
+        if download_error is not None:
+            raise Exception(f"Error downloading data for {ticker}: {download_error}")
 
         if data.empty:
             raise Exception(f"No data returned for ticker '{ticker}'. Check the symbol or date range.")
 
-        # Reset index so the Date is a normal column
-        data.reset_index(inplace=True)
-
-        # Flatten multi-level column headers if they exist
-        if isinstance(data.columns, pd.MultiIndex):
-            data.columns = data.columns.get_level_values(0)
-
-        # Save as CSV
-        try:
-            data.to_csv(output_path, index=False)
-        except Exception as e:
-            raise Exception(f"Error writing CSV to {output_path}: {e}")
+        if not write_csv:
+            return data
 
-        print(f"Saved {len(data)} rows to {output_path}")
+        # Save as CSV/Parquet on the writer thread; call flush_writes() to wait for it.
+        # The Date index is written as the first column, no reset_index copy needed.
+        write = functools.partial(self._write_frame, index_label='Date')
+        _queue_write(write, data, output_path, "rows")
         return output_path
 
     def save_options_data(self, ticker: str, options_data: dict, output: str | None = None) -> Path:
@@ -132,8 +267,10 @@ class CSVDataManager:
             output: Optional custom output path
 
         Returns:
-            Path to saved CSV file
+            Path the CSV file is written to (see flush_writes)
         """
+        import pandas as pd
+
         output_path = self._get_options_path(ticker, output)
 
         # Check if response has error
@@ -159,22 +296,18 @@ class CSVDataManager:
         if df.empty:
             raise Exception(f"No options data returned for ticker '{ticker}'")
 
-        # Save as CSV
-        try:
-            df.to_csv(output_path, index=False)
-        except Exception as e:
-            raise Exception(f"Error writing CSV to {output_path}: {e}")
-
-        print(f"Saved {len(df)} option records to {output_path}")
+        # Save as CSV on the writer thread; call flush_writes() to wait for it
+        _queue_write(self._write_frame, df, output_path, "option records")
         return output_path
 
 
 # Backward compatibility: module-level functions that use a default instance
 _default_manager = CSVDataManager()
 
-def download_to_csv(ticker: str, start: str | None = None, end: str | None = None, output: str | None = None) -> Path:
+def download_to_csv(ticker: str, start: str | None = None, end: str | None = None, output: str | None = None,
+                    timeout: int = 15, file_format: str = "csv", write_csv: bool = True) -> Path | pd.DataFrame:
     """Backward compatible wrapper for download_price_data"""
-    return _default_manager.download_price_data(ticker, start, end, output)
+    return _default_manager.download_price_data(ticker, start, end, output, timeout, file_format, write_csv)
 
 def save_options_to_csv(ticker: str, options_data: dict, output: str | None = None) -> Path:
     """Backward compatible wrapper for save_options_data"""
@@ -201,11 +334,20 @@ def main():
         help="Output CSV filename (optional, default: TICKER.csv)",
         default=None,
     )
+    parser.add_argument(
+        "--format",
+        help="Output file format (optional, default: csv)",
+        choices=["csv", "parquet"],
+        default="csv",
+    )
 
     args = parser.parse_args()
+    # The writer thread reports saved files through logging
+    basicConfig(level=INFO, format="%(message)s")
 
     try:
-        download_to_csv(args.ticker, args.start, args.end, args.output)
+        download_to_csv(args.ticker, args.start, args.end, args.output, file_format=args.format)
+        flush_writes()
     except Exception as e:
         print(str(e), file=sys.stderr)
         sys.exit(1)
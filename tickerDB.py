@@ -3,19 +3,93 @@
 from contextlib import contextmanager
 import time
 from dataclasses import dataclass, field
-from datetime import datetime
-from typing import Optional
+from datetime import date, datetime, timedelta
+from typing import Optional, cast
 import psycopg2
+import psycopg2.errors
+from psycopg2.extras import Json, execute_values
+from psycopg2.pool import ThreadedConnectionPool
+import atexit
+import csv
+import io
+import itertools
+from logging import INFO, basicConfig, getLogger
+from operator import attrgetter
 import os
-import json
+import sys
+import threading
 import uuid
+import numpy as np
 import pandas as pd
 
 
 from tickerCollections import tickerCollection
 from tickerInfo import tickerInfo
 
-@dataclass
+# Per-row insert messages are DEBUG so a normal run doesn't pay for stdout writes
+# (imported as getLogger because this module defines its own `logging` table class)
+log = getLogger(__name__)
+
+def column_values(df, column, dtype):
+    """
+    One DataFrame column as Python values cast to dtype, None for missing cells.
+    A column the frame doesn't have comes back all None.
+    """
+    values = np.full(len(df), None, dtype=object)
+    if column in df.columns:
+        series = df[column]
+        present = series.notna().to_numpy()
+        # One cast for the whole column instead of a float()/int() per cell
+        values[present] = series.to_numpy()[present].astype(dtype)
+    return values
+
+def _jsonb(value):
+    """JSONB parameter: psycopg2's Json adapter serializes once, None stays NULL"""
+    return None if value is None else Json(value)
+
+def _copy_value(value):
+    """CSV text for one COPY field: \\N for NULL, \\x-hex for bytea"""
+    if value is None:
+        return r'\N'
+    if isinstance(value, bytes):
+        return '\\x' + value.hex()
+    return value
+
+def copy_insert(cursor, table_name, columns, rows, conflict):
+    """
+    Bulk load rows with COPY into a session TEMP staging table, then move them
+    into table_name with INSERT ... SELECT so ON CONFLICT still dedups.
+    COPY streams the whole batch in one protocol exchange instead of parsing
+    a multi-row VALUES statement per page.
+    Conflicts are rare (rows belong to freshly inserted trades), so the move is
+    tried as a plain INSERT first and only replayed with ON CONFLICT if it hits one.
+    """
+    if not rows:
+        return
+    staging = f"tmp_{table_name.lower()}"
+    column_list = ", ".join(columns)
+    # Created once per pooled connection; each load empties it afterwards
+    cursor.execute(f"""
+        CREATE TEMP TABLE IF NOT EXISTS {staging}
+        AS SELECT {column_list} FROM {table_name} WITH NO DATA
+    """)
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    # \N marks NULL so real empty strings survive the round-trip
+    writer.writerows(tuple(_copy_value(value) for value in row) for row in rows)
+    buf.seek(0)
+    cursor.copy_expert(f"COPY {staging} ({column_list}) FROM STDIN WITH (FORMAT csv, NULL '\\N')", buf)
+    move = f"INSERT INTO {table_name} ({column_list}) SELECT {column_list} FROM {staging}"
+    cursor.execute("SAVEPOINT copy_insert")
+    try:
+        cursor.execute(move)
+    except psycopg2.errors.UniqueViolation:
+        cursor.execute("ROLLBACK TO SAVEPOINT copy_insert")
+        cursor.execute(f"{move} ON CONFLICT ({conflict}) DO NOTHING")
+    cursor.execute("RELEASE SAVEPOINT copy_insert")
+    cursor.execute(f"TRUNCATE {staging}")
+
+@dataclass(slots=True)
 class BatchMetrics:
     """Tracks metrics for a single cron job execution"""
     batch_id: str
@@ -65,10 +139,10 @@ class BatchMetrics:
         if had_options:
             self.tickers_with_options += 1
 
-    def add_duplicate_trade(self):
-        """Track a duplicate trade"""
-        self.duplicated_trades += 1
-        self.records_skipped += 1
+    def add_duplicate_trade(self, count: int = 1):
+        """Track duplicate trades"""
+        self.duplicated_trades += count
+        self.records_skipped += count
 
     def add_timing(self, db_time: float = 0, api_time: float = 0):
         """Add to cumulative timing metrics"""
@@ -92,15 +166,34 @@ class BatchMetrics:
             return (self._end_time - self._start_time).total_seconds()
         return 0.0
     
+    # One timer per metric so each adds straight to its slot (no getattr/setattr by name)
     @contextmanager
-    def time_operation(self, field_name: str):
-        """Context manager for timing operations and updating metrics"""
-        import time as time_module
-        start = time_module.perf_counter()
+    def time_db(self):
+        """Time a block of database work"""
+        start = time.perf_counter()
         yield
-        elapsed = time_module.perf_counter() - start
-        current_value = getattr(self, field_name)
-        setattr(self, field_name, current_value + elapsed)
+        self.db_operation_time_seconds += time.perf_counter() - start
+
+    @contextmanager
+    def time_fetch_trades(self):
+        """Time fetching the FMP trade list"""
+        start = time.perf_counter()
+        yield
+        self.time_to_fetch_trades += time.perf_counter() - start
+
+    @contextmanager
+    def time_fetch_price(self):
+        """Time fetching price history"""
+        start = time.perf_counter()
+        yield
+        self.time_to_fetch_price += time.perf_counter() - start
+
+    @contextmanager
+    def time_fetch_options(self):
+        """Time fetching options chains"""
+        start = time.perf_counter()
+        yield
+        self.time_to_fetch_options += time.perf_counter() - start
 
     @property
     def log_timestamp(self) -> str:
@@ -110,6 +203,15 @@ class BatchMetrics:
 class Database:
     """Manages database connection and provides access to repositories"""
 
+    # Process-wide pool shared by every Database block, so concurrent workers
+    # each get their own connection and repeated blocks skip the connect handshake
+    _pool: Optional[ThreadedConnectionPool] = None
+    _pool_lock = threading.Lock()
+    POOL_MIN_CONNECTIONS = 1
+    POOL_MAX_CONNECTIONS = 8
+    # Set once a block's CREATE TABLE/INDEX DDL has been committed in this process
+    _schema_ready = False
+
     def __init__(self):
         self.db_name = os.getenv("DB_NAME")
         self.db_user = os.getenv("DB_USER")
@@ -120,60 +222,138 @@ class Database:
         self.cursor = None
         self.initialized = False
 
+    def _get_pool(self) -> ThreadedConnectionPool:
+        """Create the shared connection pool on first use"""
+        with Database._pool_lock:
+            if Database._pool is None:
+                Database._pool = ThreadedConnectionPool(
+                    self.POOL_MIN_CONNECTIONS,
+                    self.POOL_MAX_CONNECTIONS,
+                    dbname=self.db_name,
+                    user=self.db_user,
+                    password=self.db_password,
+                    host=self.db_host,
+                    port=self.db_port
+                )
+                atexit.register(Database._pool.closeall)
+            return Database._pool
+
+    @classmethod
+    def check(cls):
+        """Validate connectivity up front; raises if Postgres is unreachable"""
+        db = cls()
+        conn = db._get_pool().getconn()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+        finally:
+            db._get_pool().putconn(conn)
+
     def __enter__(self):
-        self.conn = psycopg2.connect(
-            dbname=self.db_name,
-            user=self.db_user,
-            password=self.db_password,
-            host=self.db_host,
-            port=self.db_port
-        )
+        self.conn = self._get_pool().getconn()
         self.cursor = self.conn.cursor()
+        self._begin()
         # written this way to allow for lsp autocompletion of tables
-        if not self.initialized:
-            self.tickers = InsiderTradingRecords(self.cursor, self.conn)
+        # Repositories are rebuilt on every entry since they hold this block's cursor
+        self.tickers = InsiderTradingRecords(self.cursor, self.conn)
+        self.errors = ErrorRecords(self.cursor, self.conn)
+        self.pricing = InsiderTradingPricingRecords(self.cursor, self.conn)
+        self.options = InsiderTradingOptionsRecords(self.cursor, self.conn)
+        self.logging = logging(self.cursor, self.conn)
+        # The DDL/migrations only run until one block has committed them
+        if not Database._schema_ready:
             self.tickers.createTable()
-            self.errors = ErrorRecords(self.cursor, self.conn)
             self.errors.createTable()
-            self.pricing = InsiderTradingPricingRecords(self.cursor, self.conn)
             self.pricing.createTable()
-            self.options = InsiderTradingOptionsRecords(self.cursor, self.conn)
             self.options.createTable()
-            self.logging = logging(self.cursor, self.conn)
             self.logging.createTable()
-            self.initialized=True
+            self.initialized = True
         return self
 
+    def _begin(self):
+        """Settings for the transaction the next statement opens"""
+        # Bulk ingest: don't wait on the WAL flush at commit. A crash can only lose the
+        # last batches, which the next run re-fetches from FMP. LOCAL ends with the transaction,
+        # so connections handed back to the pool keep the server default
+        self.cursor.execute("SET LOCAL synchronous_commit = OFF")
+
+    def commit(self):
+        """Commit the work so far and keep going in a fresh transaction"""
+        self.conn.commit()
+        self._begin()
+
     def __exit__(self, exc_type, exc_val, exc_tb):
         if self.cursor:
             self.cursor.close()
         if self.conn:
             if exc_type is None:
                 self.conn.commit()
+                if self.initialized:
+                    Database._schema_ready = True
             else:
                 self.conn.rollback()
-            self.conn.close()
+            self._get_pool().putconn(self.conn, close=bool(self.conn.closed))
         return False
 
+    def load_recent_hashes(self, days: int = 7) -> set[str]:
+        """
+        record_hash of every trade first seen in the last `days` days, in one query.
+        FMP's latest-trades feed mostly repeats recent trades, so a set lookup
+        filters them out before they are sent to the database.
+        """
+        self.cursor.execute(f"""
+            SELECT encode(record_hash, 'hex') FROM {self.tickers.table_name}
+            WHERE first_seen_at > NOW() - make_interval(days => %s)
+        """, (days,))
+        return {row[0] for row in self.cursor.fetchall()}
+
+    @contextmanager
+    def savepoint(self, name: str = "ticker"):
+        """
+        Run a block under a SAVEPOINT inside the batch transaction.
+        A failing statement only rolls back its own block instead of aborting
+        the transaction for every ticker after it.
+        """
+        self.cursor.execute(f"SAVEPOINT {name}")
+        try:
+            yield
+        except Exception:
+            self.cursor.execute(f"ROLLBACK TO SAVEPOINT {name}")
+            raise
+        self.cursor.execute(f"RELEASE SAVEPOINT {name}")
+
 
 class InsiderTradingRecords:
     """Handles all operations for the ticker table"""
 
+    # Name of the per-session prepared single-row upsert
+    INSERT_STATEMENT = "insert_trade"
+    # tickerInfo fields between record_hash and the JSONB columns in the insert column list,
+    # read with one C-level call per row. Both trade dates are the parsed dates (None when FMP
+    # sent '' or garbage), so one bad row can't fail the DATE cast for the whole statement
+    _get_columns = attrgetter(
+        'symbol', '_transaction_dt', 'firstName', 'lastName', 'type', 'amount',
+        'owner', 'assetType', '_disclosure_dt', 'office', 'district', 'assetDescription',
+        'capitalGainsOver200USD', 'comment', 'link'
+    )
+
     def __init__(self, cursor, conn):
         self.cursor = cursor
         self.conn = conn
         self.table_name = "InsiderTradingRecords"
+        self.prepared = False
 
     def createTable(self):
         """Create ticker table if it doesn't exist"""
         self.cursor.execute(f"""
             CREATE TABLE IF NOT EXISTS {self.table_name} (
                 id SERIAL PRIMARY KEY,
-                record_hash VARCHAR(64) UNIQUE NOT NULL,
+                record_hash BYTEA UNIQUE NOT NULL,
 
                 -- Core trade details (used for hashing)
                 symbol VARCHAR(100) NOT NULL,
-                transactionDate VARCHAR(100),
+                transactionDate DATE,
                 firstName VARCHAR(100),
                 lastName VARCHAR(100),
                 type VARCHAR(100),
@@ -182,7 +362,7 @@ class InsiderTradingRecords:
                 assetType VARCHAR(100),
 
                 -- Additional trade info (not hashed)
-                disclosureDate VARCHAR(100),
+                disclosureDate DATE,
                 office VARCHAR(100),
                 district VARCHAR(100),
                 assetDescription TEXT,
@@ -200,62 +380,198 @@ class InsiderTradingRecords:
                 last_seen_at TIMESTAMP DEFAULT NOW()
             )
         """)
-        # Indexes for common queries
+        # Tables created before the trade dates were DATEs still hold them as text
+        self.cursor.execute("""
+            SELECT column_name FROM information_schema.columns
+            WHERE table_name = lower(%s)
+              AND column_name IN ('transactiondate', 'disclosuredate')
+              AND data_type <> 'date'
+        """, (self.table_name,))
+        for (column,) in self.cursor.fetchall():
+            self.cursor.execute(f"""
+                ALTER TABLE {self.table_name}
+                ALTER COLUMN {column} TYPE DATE USING NULLIF({column}, '')::date
+            """)
+        self.migrate_record_hash()
+        # Index DDL goes to the server as one multi-statement batch (one round-trip)
         self.cursor.execute(f"""
+            -- Indexes for common queries
             CREATE INDEX IF NOT EXISTS idx_{self.table_name}_symbol
-            ON {self.table_name}(symbol)
-        """)
-        self.cursor.execute(f"""
-            CREATE INDEX IF NOT EXISTS idx_{self.table_name}_transaction_date
-            ON {self.table_name}(transactionDate)
-        """)
-        self.cursor.execute(f"""
+            ON {self.table_name}(symbol);
+
+            -- Rows arrive roughly in date order, so block-range (BRIN) indexes stay
+            -- tiny compared to the B-tree they replace
+            DROP INDEX IF EXISTS idx_{self.table_name}_transaction_date;
+            CREATE INDEX IF NOT EXISTS idx_{self.table_name}_transaction_date_brin
+            ON {self.table_name} USING BRIN (transactionDate) WITH (pages_per_range = 32);
+            CREATE INDEX IF NOT EXISTS idx_{self.table_name}_first_seen_brin
+            ON {self.table_name} USING BRIN (first_seen_at) WITH (pages_per_range = 32);
+
             CREATE INDEX IF NOT EXISTS idx_{self.table_name}_batch_id
-            ON {self.table_name}(batch_id)
+            ON {self.table_name}(batch_id);
+
+            -- Containment (@>) lookups on the enriched JSONB; jsonb_path_ops keeps
+            -- the GIN small, and rows that were never enriched are left out of it
+            CREATE INDEX IF NOT EXISTS idx_{self.table_name}_price_data_gin
+            ON {self.table_name} USING GIN (priceData jsonb_path_ops) WHERE priceData IS NOT NULL;
+            CREATE INDEX IF NOT EXISTS idx_{self.table_name}_options_data_gin
+            ON {self.table_name} USING GIN (optionsData jsonb_path_ops) WHERE optionsData IS NOT NULL;
         """)
         print(f"Table {self.table_name} created successfully")
 
+    def migrate_record_hash(self):
+        """
+        Convert a hex VARCHAR(64) record_hash (and the pricing/options foreign keys
+        to it) into raw BYTEA digests, once. Half the bytes per key and index entry.
+        """
+        self.cursor.execute("""
+            SELECT data_type FROM information_schema.columns
+            WHERE table_name = lower(%s) AND column_name = 'record_hash'
+        """, (self.table_name,))
+        column = self.cursor.fetchone()
+        if not column or column[0] == 'bytea':
+            return
+        self.cursor.execute("""
+            SELECT relname FROM pg_class
+            WHERE relname IN ('insidertradingpricingrecords', 'insidertradingoptionsrecords')
+              AND relkind IN ('r', 'p')
+        """)
+        dependents = [row[0] for row in self.cursor.fetchall()]
+        # The key type can't change while foreign keys point at it
+        for dependent in dependents:
+            self.cursor.execute(f"ALTER TABLE {dependent} DROP CONSTRAINT IF EXISTS {dependent}_record_hash_fkey")
+        for table in [self.table_name] + dependents:
+            self.cursor.execute(f"""
+                ALTER TABLE {table}
+                ALTER COLUMN record_hash TYPE BYTEA USING decode(record_hash, 'hex')
+            """)
+        # Every row satisfied the key before the conversion and decode() maps both sides
+        # identically, so skip the full re-check scan; new rows are still enforced
+        for dependent in dependents:
+            self.cursor.execute(f"""
+                ALTER TABLE {dependent} ADD CONSTRAINT {dependent}_record_hash_fkey
+                FOREIGN KEY (record_hash) REFERENCES {self.table_name}(record_hash) NOT VALID
+            """)
+        print(f"Migrated record_hash to BYTEA on {', '.join([self.table_name] + dependents)}")
+
+    def _row(self, data, batch_id):
+        """Insert parameters for one trade, in the column order of the INSERTs"""
+        return (data.record_digest, *self._get_columns(data),
+                _jsonb(data.priceData), _jsonb(data.optionsData), batch_id)
+
+    def prepare_insert(self):
+        """
+        PREPARE the single-row upsert so repeated insert() calls skip parse/plan.
+        Prepared statements live as long as the (pooled) connection, so only
+        create it if this session doesn't have it yet.
+        """
+        if self.prepared:
+            return
+        self.cursor.execute("SELECT 1 FROM pg_prepared_statements WHERE name = %s",
+                            (self.INSERT_STATEMENT,))
+        if self.cursor.fetchone() is None:
+            # No precheck: the upsert itself tells us whether the row was new
+            # (xmax is 0 only for a freshly inserted row, not an updated one)
+            self.cursor.execute(f"""
+                PREPARE {self.INSERT_STATEMENT} AS
+                INSERT INTO {self.table_name} (
+                    record_hash, symbol, transactionDate, firstName, lastName, type, amount,
+                    owner, assetType, disclosureDate, office, district, assetDescription,
+                    capitalGainsOver200USD, comment, link, priceData, optionsData, batch_id
+                )
+                VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15, $16, $17, $18, $19)
+                ON CONFLICT (record_hash) DO UPDATE
+                SET last_seen_at = NOW(),
+                    batch_id = EXCLUDED.batch_id
+                WHERE {self.table_name}.batch_id IS DISTINCT FROM EXCLUDED.batch_id
+                RETURNING (xmax = 0) AS inserted
+            """)
+        self.prepared = True
+
     def insert(self, data, batch_id=None)->bool:
         """
         Insert a single ticker record with automatic deduplication.
         If duplicate (same hash), updates last_seen_at timestamp.
         """
         record_hash = data.record_hash
-        if self.is_duplicate(data):
-            return False
-        
+        self.prepare_insert()
         self.cursor.execute(f"""
+            EXECUTE {self.INSERT_STATEMENT} (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """,
+            self._row(data, batch_id)
+        )
+        # No row comes back when the conflict update was skipped (same batch)
+        row = self.cursor.fetchone()
+        inserted = row is not None and row[0]
+        log.debug("Data processed for %s (hash: %s...)", data.symbol, record_hash[:8])
+        return inserted
+
+    def insert_many(self, tickers, batch_id=None) -> set:
+        """
+        Upsert every ticker record in one multi-row statement.
+        Existing hashes get last_seen_at/batch_id refreshed like insert() does
+        (once per batch; a repeat within the same batch writes no new tuple);
+        RETURNING hands back only the hashes that were newly inserted.
+        """
+        # DO UPDATE can't touch the same row twice in one statement, so one row per hash
+        rows = list({
+            data.record_digest: self._row(data, batch_id)
+            for data in tickers
+        }.values())
+        if not rows:
+            return set()
+        returned = execute_values(self.cursor, f"""
             INSERT INTO {self.table_name} (
                 record_hash, symbol, transactionDate, firstName, lastName, type, amount,
                 owner, assetType, disclosureDate, office, district, assetDescription,
                 capitalGainsOver200USD, comment, link, priceData, optionsData, batch_id
             )
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            VALUES %s
             ON CONFLICT (record_hash) DO UPDATE
             SET last_seen_at = NOW(),
                 batch_id = EXCLUDED.batch_id
-        """,
-            (record_hash, data.symbol, data.transactionDate, data.firstName, data.lastName,
-             data.type, data.amount, data.owner, data.assetType, data.disclosureDate,
-             data.office, data.district, data.assetDescription, data.capitalGainsOver200USD,
-             data.comment, data.link, data.priceData, data.optionsData, batch_id)
-        )
-        print(f"Data processed for {data.symbol} (hash: {record_hash[:8]}...)")
-        return True
+            WHERE {self.table_name}.batch_id IS DISTINCT FROM EXCLUDED.batch_id
+            RETURNING record_hash, (xmax = 0) AS inserted
+        """, rows, page_size=500, fetch=True)
+        inserted = {bytes(record_hash).hex() for record_hash, is_new in returned if is_new}
+        log.info("Inserted %d of %d trades into %s", len(inserted), len(rows), self.table_name)
+        return inserted
+
+    def refresh_seen(self, tickers, batch_id=None) -> int:
+        """
+        Bump last_seen_at/batch_id for trades already stored, in one UPDATE.
+        The same refresh insert_many's conflict path does, for the repeats the
+        caller filtered out before the upsert. Returns the number of rows touched.
+        """
+        digests = list({data.record_digest for data in tickers})
+        if not digests:
+            return 0
+        self.cursor.execute(f"""
+            UPDATE {self.table_name}
+            SET last_seen_at = NOW(),
+                batch_id = %s
+            WHERE record_hash = ANY(%s)
+              AND batch_id IS DISTINCT FROM %s
+        """, (batch_id, digests, batch_id))
+        return self.cursor.rowcount
 
     def is_duplicate(self, tickerData):
         """Check for duplicates in the database"""
+        # rowcount isn't meaningful for SELECT; fetch a single constant row instead
         self.cursor.execute(f"""
-            SELECT * FROM {self.table_name}
+            SELECT 1 FROM {self.table_name}
             WHERE record_hash = %s
-        """, (tickerData.record_hash,))
-        if self.cursor.rowcount > 0:
-            return True
-        return False
+            LIMIT 1
+        """, (tickerData.record_digest,))
+        return self.cursor.fetchone() is not None
 
 
 class ErrorRecords:
     """Records All API errors and their raw responses"""
+
+    # Rows fetched (and written out) per round-trip by show_all_errors
+    SHOW_CHUNK_ROWS = 1000
+
     def __init__(self, cursor, conn):
         self.cursor = cursor
         self.conn = conn
@@ -263,6 +579,7 @@ class ErrorRecords:
 
     def createTable(self):
         """Create error records table if it doesn't exist"""
+        # Table and index DDL go to the server as one multi-statement batch
         self.cursor.execute(f"""
             CREATE TABLE IF NOT EXISTS {self.table_name} (
                 id SERIAL PRIMARY KEY,
@@ -272,12 +589,11 @@ class ErrorRecords:
                 error_message TEXT,
                 raw_json JSONB,
                 stack_trace TEXT
-            )
-        """)
-        # Create index for querying by batch
-        self.cursor.execute(f"""
+            );
+
+            -- Create index for querying by batch
             CREATE INDEX IF NOT EXISTS idx_error_batch_id
-            ON {self.table_name}(batch_id)
+            ON {self.table_name}(batch_id);
         """)
         print(f"Table {self.table_name} created successfully")
 
@@ -287,19 +603,29 @@ class ErrorRecords:
             INSERT INTO {self.table_name}
             (batch_id, error_type, error_message, raw_json, stack_trace)
             VALUES (%s, %s, %s, %s, %s)
-        """, (batch_id, error_type, error_msg, json.dumps(raw_data), stack_trace))
+        """, (batch_id, error_type, error_msg, Json(raw_data), stack_trace))
 
     def show_all_errors(self):
         """Show all errors in the error table"""
-        self.cursor.execute(f"""
-            SELECT * FROM {self.table_name}
-        """)
-        for row in self.cursor:
-            print(row)  # Prints each row as a tuple    
+        # Named (server-side) cursor streams the table in chunks instead of
+        # buffering it client-side; each chunk is printed with a single write
+        with self.conn.cursor(name='err_stream') as cursor:
+            cursor.execute(f"""
+                SELECT * FROM {self.table_name}
+            """)
+            while rows := cursor.fetchmany(self.SHOW_CHUNK_ROWS):
+                sys.stdout.write("\n".join(map(str, rows)) + "\n")  # Each row as a tuple
 
 class InsiderTradingPricingRecords:
     """Handles all operations for the ticker table"""
 
+    # Insert column order, matching the tuples from build_rows
+    COLUMNS = ("ticker", "record_hash", "date", "close_price", "high_price", "low_price",
+               "open_price", "volume")
+    # Schema facts found by createTable; class-level so they outlive this block's
+    # repository (later Database blocks skip the DDL)
+    partitioned = False
+
     def __init__(self, cursor, conn):
         self.cursor = cursor
         self.conn = conn
@@ -307,83 +633,133 @@ class InsiderTradingPricingRecords:
 
     def createTable(self):
         """Create ticker table if it doesn't exist"""
+        # New databases get monthly range partitions on date (keys must include date);
+        # a table created before partitioning keeps working unpartitioned
         self.cursor.execute(f"""
             CREATE TABLE IF NOT EXISTS {self.table_name} (
-                id SERIAL PRIMARY KEY,
+                id SERIAL,
                 ticker VARCHAR(100),
-                record_hash VARCHAR(64) REFERENCES InsiderTradingRecords(record_hash),
-                date DATE,
-                close_price DECIMAL(10,2),
-                high_price DECIMAL(10,2),
-                low_price DECIMAL(10,2),
-                open_price DECIMAL(10,2),
+                record_hash BYTEA REFERENCES InsiderTradingRecords(record_hash),
+                date DATE NOT NULL,
+                close_price DOUBLE PRECISION,
+                high_price DOUBLE PRECISION,
+                low_price DOUBLE PRECISION,
+                open_price DOUBLE PRECISION,
                 volume BIGINT,
+                PRIMARY KEY (id, date),
                 UNIQUE(record_hash, date)
-            )
+            ) PARTITION BY RANGE (date)
         """)
-        # Index for querying by ticker
+        # Prices were DECIMAL(10,2) before; native 8-byte floats are fixed-width and cheaper to scan
+        self.cursor.execute("""
+            SELECT data_type FROM information_schema.columns
+            WHERE table_name = lower(%s) AND column_name = 'close_price'
+        """, (self.table_name,))
+        column = self.cursor.fetchone()
+        if column and column[0] == 'numeric':
+            self.cursor.execute(f"""
+                ALTER TABLE {self.table_name}
+                ALTER COLUMN close_price TYPE DOUBLE PRECISION,
+                ALTER COLUMN high_price TYPE DOUBLE PRECISION,
+                ALTER COLUMN low_price TYPE DOUBLE PRECISION,
+                ALTER COLUMN open_price TYPE DOUBLE PRECISION
+            """)
+        self.cursor.execute("SELECT relkind = 'p' FROM pg_class WHERE oid = %s::regclass",
+                            (self.table_name,))
+        InsiderTradingPricingRecords.partitioned = self.cursor.fetchone()[0]
+        # Index DDL goes to the server as one multi-statement batch (one round-trip)
         self.cursor.execute(f"""
+            -- Index for querying by ticker
             CREATE INDEX IF NOT EXISTS idx_{self.table_name}_ticker
-            ON {self.table_name}(ticker)
-        """)
-        # Index for foreign key relationship
-        self.cursor.execute(f"""
+            ON {self.table_name}(ticker);
+
+            -- Index for foreign key relationship
             CREATE INDEX IF NOT EXISTS idx_{self.table_name}_record_hash
-            ON {self.table_name}(record_hash)
-        """)
-        # Composite index for time-series queries by ticker
-        self.cursor.execute(f"""
-            CREATE INDEX IF NOT EXISTS idx_{self.table_name}_ticker_date
-            ON {self.table_name}(ticker, date)
+            ON {self.table_name}(record_hash);
+
+            -- Time-range queries use a BRIN on date (rows arrive in date order) plus
+            -- the ticker index above, instead of a (ticker, date) B-tree
+            DROP INDEX IF EXISTS idx_{self.table_name}_ticker_date;
+            CREATE INDEX IF NOT EXISTS idx_{self.table_name}_date_brin
+            ON {self.table_name} USING BRIN (date);
         """)
         print(f"Table {self.table_name} created successfully")
-        
+
+    def ensure_partitions(self, rows: list[tuple]):
+        """
+        Create the monthly partitions the rows' dates fall in, if missing.
+        Nothing is cached between calls: a savepoint or batch rollback also drops
+        the partitions it created, so every load re-issues the (cheap) IF NOT EXISTS
+        DDL for its months, all in one round-trip.
+        """
+        if not self.partitioned:
+            return
+        statements = []
+        for month in sorted({row[2][:7] for row in rows}):
+            start = date.fromisoformat(f"{month}-01")
+            end = (start + timedelta(days=32)).replace(day=1)
+            statements.append(f"""
+                CREATE TABLE IF NOT EXISTS {self.table_name}_{start:%Y_%m}
+                PARTITION OF {self.table_name}
+                FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}');
+            """)
+        if statements:
+            self.cursor.execute("".join(statements))
+
     def insert(self, df: pd.DataFrame, tickerData: tickerInfo):
         """
         Insert pricing data for a specific trade (record_hash).
         df: pandas DataFrame from yfinance with date index and OHLCV columns
         tickerData: the specific trade this pricing data belongs to
         """
-        if self.get_duplicates(tickerData):
-            print(f"Duplicate PRICING hash found for {tickerData.symbol} (hash: {tickerData.record_hash[:8]}...)")
-            return False
-        rows = []
-        for date, row in df.iterrows():
-            rows.append((
-                tickerData.symbol,
-                tickerData.record_hash,
-                date.strftime('%Y-%m-%d'),
-                float(row['Close']) if 'Close' in row and pd.notna(row['Close']) else None,
-                float(row['High']) if 'High' in row and pd.notna(row['High']) else None,
-                float(row['Low']) if 'Low' in row and pd.notna(row['Low']) else None,
-                float(row['Open']) if 'Open' in row and pd.notna(row['Open']) else None,
-                int(row['Volume']) if 'Volume' in row and pd.notna(row['Volume']) else None
-            ))
-
-        # Bulk insert with executemany
-        self.cursor.executemany(f"""
-            INSERT INTO {self.table_name}
-            (ticker, record_hash, date, close_price, high_price, low_price, open_price, volume)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-            ON CONFLICT (record_hash, date) DO NOTHING
-        """, rows)
-        print(f"Inserted {len(rows)} price records for {tickerData.symbol} (hash: {tickerData.record_hash[:8]}...)")
+        # ON CONFLICT (record_hash, date) DO NOTHING handles duplicates, no precheck needed
+        rows = self.build_rows(df, tickerData)
+        self.insert_rows(rows)
+        log.debug("Inserted %d price records for %s (hash: %s...)", len(rows), tickerData.symbol, tickerData.record_hash[:8])
 
         return True
-        
+
+    def build_rows(self, df: pd.DataFrame, tickerData: tickerInfo) -> list[tuple]:
+        """Convert a yfinance DataFrame into insert-ready tuples for one trade"""
+        # yfinance price history is always indexed by date
+        dates = cast(pd.DatetimeIndex, df.index)
+        return list(zip(
+            itertools.repeat(tickerData.symbol),
+            itertools.repeat(tickerData.record_digest),
+            dates.strftime('%Y-%m-%d'),
+            column_values(df, 'Close', np.float64),
+            column_values(df, 'High', np.float64),
+            column_values(df, 'Low', np.float64),
+            column_values(df, 'Open', np.float64),
+            column_values(df, 'Volume', np.int64)
+        ))
+
+    def insert_rows(self, rows: list[tuple]):
+        """
+        Bulk insert pricing tuples, possibly spanning many trades.
+        Rows are COPYed through a staging table (see copy_insert).
+        """
+        self.ensure_partitions(rows)
+        copy_insert(self.cursor, self.table_name, self.COLUMNS, rows, "record_hash, date")
+
     def get_duplicates(self, tickerData):
         """Check for duplicates in the database"""
+        # rowcount isn't meaningful for SELECT; fetch a single constant row instead
         self.cursor.execute(f"""
-            SELECT * FROM {self.table_name}
+            SELECT 1 FROM {self.table_name}
             WHERE record_hash = %s
-        """, (tickerData.record_hash,))
-        if self.cursor.rowcount > 0:
-            return True
-        return False
+            LIMIT 1
+        """, (tickerData.record_digest,))
+        return self.cursor.fetchone() is not None
 
 class InsiderTradingOptionsRecords:
     """Handles all operations for the ticker table"""
 
+    # Insert column order, matching the tuples from build_rows
+    COLUMNS = ("ticker", "record_hash", "s", "option_symbol", "underlying", "expiration", "side",
+               "strike", "first_traded", "dte", "updated", "bid", "bid_size", "mid", "ask",
+               "ask_size", "last", "open_interest", "volume", "in_the_money", "intrinsic_value",
+               "extrinsic_value", "underlying_price", "iv", "delta", "gamma", "theta", "vega")
 
     def __init__(self, cursor, conn):
         self.cursor = cursor
@@ -392,11 +768,12 @@ class InsiderTradingOptionsRecords:
 
     def createTable(self):
         """Create options table if it doesn't exist"""
+        # Table and index DDL go to the server as one multi-statement batch
         self.cursor.execute(f"""
             CREATE TABLE IF NOT EXISTS {self.table_name} (
                 id SERIAL PRIMARY KEY,
                 ticker VARCHAR(100),
-                record_hash VARCHAR(64) REFERENCES InsiderTradingRecords(record_hash),
+                record_hash BYTEA REFERENCES InsiderTradingRecords(record_hash),
                 s VARCHAR(50),
                 option_symbol VARCHAR(100),
                 underlying VARCHAR(50),
@@ -424,22 +801,19 @@ class InsiderTradingOptionsRecords:
                 theta DECIMAL(10,4),
                 vega DECIMAL(10,4),
                 UNIQUE(record_hash, option_symbol)
-            )
-        """)
-        # Index for querying by ticker
-        self.cursor.execute(f"""
+            );
+
+            -- Index for querying by ticker
             CREATE INDEX IF NOT EXISTS idx_{self.table_name}_ticker
-            ON {self.table_name}(ticker)
-        """)
-        # Index for foreign key relationship
-        self.cursor.execute(f"""
+            ON {self.table_name}(ticker);
+
+            -- Index for foreign key relationship
             CREATE INDEX IF NOT EXISTS idx_{self.table_name}_record_hash
-            ON {self.table_name}(record_hash)
-        """)
-        # Index for expiration date queries
-        self.cursor.execute(f"""
+            ON {self.table_name}(record_hash);
+
+            -- Index for expiration date queries
             CREATE INDEX IF NOT EXISTS idx_{self.table_name}_expiration
-            ON {self.table_name}(expiration)
+            ON {self.table_name}(expiration);
         """)
         print(f"Table {self.table_name} created successfully")
 
@@ -449,67 +823,62 @@ class InsiderTradingOptionsRecords:
         df: pandas DataFrame from options API
         tickerData: the specific trade this Options data belongs to
         """
-        # Prepare all rows as a list for bulk insert
-        if self.get_duplicates(tickerData):
-            print(f"Duplicate OPTIONS hash found for {tickerData.symbol} (hash: {tickerData.record_hash[:8]}...)")
-            return False
-        rows = []
-
-        for _, row in df.iterrows():
-            rows.append((
-                tickerData.symbol,
-                tickerData.record_hash,
-                row.get('s'),
-                row.get('optionSymbol'),
-                row.get('underlying'),
-                int(row['expiration']) if pd.notna(row.get('expiration')) else None,
-                row.get('side'),
-                float(row['strike']) if pd.notna(row.get('strike')) else None,
-                int(row['firstTraded']) if pd.notna(row.get('firstTraded')) else None,
-                int(row['dte']) if pd.notna(row.get('dte')) else None,
-                int(row['updated']) if pd.notna(row.get('updated')) else None,
-                float(row['bid']) if pd.notna(row.get('bid')) else None,
-                int(row['bidSize']) if pd.notna(row.get('bidSize')) else None,
-                float(row['mid']) if pd.notna(row.get('mid')) else None,
-                float(row['ask']) if pd.notna(row.get('ask')) else None,
-                int(row['askSize']) if pd.notna(row.get('askSize')) else None,
-                float(row['last']) if pd.notna(row.get('last')) else None,
-                int(row['openInterest']) if pd.notna(row.get('openInterest')) else None,
-                int(row['volume']) if pd.notna(row.get('volume')) else None,
-                bool(row['inTheMoney']) if pd.notna(row.get('inTheMoney')) else None,
-                float(row['intrinsicValue']) if pd.notna(row.get('intrinsicValue')) else None,
-                float(row['extrinsicValue']) if pd.notna(row.get('extrinsicValue')) else None,
-                float(row['underlyingPrice']) if pd.notna(row.get('underlyingPrice')) else None,
-                float(row['iv']) if pd.notna(row.get('iv')) else None,
-                float(row['delta']) if pd.notna(row.get('delta')) else None,
-                float(row['gamma']) if pd.notna(row.get('gamma')) else None,
-                float(row['theta']) if pd.notna(row.get('theta')) else None,
-                float(row['vega']) if pd.notna(row.get('vega')) else None,
-            ))
-
-        # Bulk insert with executemany
-        self.cursor.executemany(f"""
-            INSERT INTO {self.table_name}
-            (ticker, record_hash, s, option_symbol, underlying, expiration, side, strike,
-             first_traded, dte, updated, bid, bid_size, mid, ask, ask_size, last,
-             open_interest, volume, in_the_money, intrinsic_value, extrinsic_value,
-             underlying_price, iv, delta, gamma, theta, vega)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            ON CONFLICT (record_hash, option_symbol) DO NOTHING
-        """, rows)
-
-        print(f"Inserted {len(rows)} options records for {tickerData.symbol} (hash: {tickerData.record_hash[:8]}...)")
+        # ON CONFLICT (record_hash, option_symbol) DO NOTHING handles duplicates, no precheck needed
+        rows = self.build_rows(df, tickerData)
+        self.insert_rows(rows)
+
+        log.debug("Inserted %d options records for %s (hash: %s...)", len(rows), tickerData.symbol, tickerData.record_hash[:8])
         return True
 
+    def build_rows(self, df: pd.DataFrame, tickerData: tickerInfo) -> list[tuple]:
+        """Convert an options chain DataFrame into insert-ready tuples for one trade"""
+        return list(zip(
+            itertools.repeat(tickerData.symbol),
+            itertools.repeat(tickerData.record_digest),
+            column_values(df, 's', object),
+            column_values(df, 'optionSymbol', object),
+            column_values(df, 'underlying', object),
+            column_values(df, 'expiration', np.int64),
+            column_values(df, 'side', object),
+            column_values(df, 'strike', np.float64),
+            column_values(df, 'firstTraded', np.int64),
+            column_values(df, 'dte', np.int64),
+            column_values(df, 'updated', np.int64),
+            column_values(df, 'bid', np.float64),
+            column_values(df, 'bidSize', np.int64),
+            column_values(df, 'mid', np.float64),
+            column_values(df, 'ask', np.float64),
+            column_values(df, 'askSize', np.int64),
+            column_values(df, 'last', np.float64),
+            column_values(df, 'openInterest', np.int64),
+            column_values(df, 'volume', np.int64),
+            column_values(df, 'inTheMoney', bool),
+            column_values(df, 'intrinsicValue', np.float64),
+            column_values(df, 'extrinsicValue', np.float64),
+            column_values(df, 'underlyingPrice', np.float64),
+            column_values(df, 'iv', np.float64),
+            column_values(df, 'delta', np.float64),
+            column_values(df, 'gamma', np.float64),
+            column_values(df, 'theta', np.float64),
+            column_values(df, 'vega', np.float64),
+        ))
+
+    def insert_rows(self, rows: list[tuple]):
+        """
+        Bulk insert options tuples, possibly spanning many trades.
+        Rows are COPYed through a staging table (see copy_insert).
+        """
+        copy_insert(self.cursor, self.table_name, self.COLUMNS, rows, "record_hash, option_symbol")
+
     def get_duplicates(self, tickerData):
         """Check for duplicates in the database"""
+        # rowcount isn't meaningful for SELECT; fetch a single constant row instead
         self.cursor.execute(f"""
-            SELECT * FROM {self.table_name}
+            SELECT 1 FROM {self.table_name}
             WHERE record_hash = %s
-        """, (tickerData.record_hash,))
-        if self.cursor.rowcount > 0:
-            return True
-        return False
+            LIMIT 1
+        """, (tickerData.record_digest,))
+        return self.cursor.fetchone() is not None
 
 class logging:
     def __init__(self, cursor, conn):
@@ -572,6 +941,7 @@ class logging:
 
 
 if __name__ == "__main__":
+    basicConfig(level=INFO)
     print("Running main...")
     with Database() as db:
         print("Initialized DB")
@@ -579,21 +949,39 @@ if __name__ == "__main__":
         listData = collection.tickerList
         total_time_outside_requests=0
         batch_id = str(uuid.uuid4())
-        for data in listData:
+        # Commit every COMMIT_EVERY tickers so one long run doesn't hold a single huge transaction
+        COMMIT_EVERY = 500
+        # Trades go in up front, FLUSH_EVERY rows per multi-row statement, so the
+        # pricing/options rows below always find their parent record_hash
+        FLUSH_EVERY = 1000
+        for start in range(0, len(listData), FLUSH_EVERY):
+            chunk = listData[start:start + FLUSH_EVERY]
+            try:
+                with db.savepoint():
+                    db.tickers.insert_many(chunk, batch_id)
+            except Exception as e:
+                print("threw an error down here " + str(e) + " for trades " + str(start) + "-" + str(start + len(chunk)))
+                db.errors.log_error(batch_id, "Error inserting trade batch", str(e), {"trades": len(chunk)})
+        for count, data in enumerate(listData, start=1):
             print(data.symbol)      
             try:
-                db.tickers.insert(data)
                 data.getPriceData()
                 interval1_start= time.time()
-                db.pricing.insert(data.priceData, data)
+                if data.priceData is not None:
+                    with db.savepoint():
+                        db.pricing.insert(data.priceData, data)
                 interval1_end= time.time()
                 data.getOptionsData()
                 interval2_start= time.time()
-                db.options.insert(data.optionsData, data)
+                if data.optionsData is not None:
+                    with db.savepoint():
+                        db.options.insert(data.optionsData, data)
                 interval2_end= time.time()
                 total_time_outside_requests=total_time_outside_requests+(interval1_end-interval1_start)+(interval2_end-interval2_start)
 
             except Exception as e:
                 print("threw an error down here " + str(e)+ " for ticker symbol: "+ data.symbol)
                 db.errors.log_error(batch_id, "Error inserting data for "+data.symbol, str(e), {"symbol": data.symbol})
+            if count % COMMIT_EVERY == 0:
+                db.commit()
         print(f"Total time spent outside requests: {total_time_outside_requests}")
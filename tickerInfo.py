@@ -1,103 +1,161 @@
 #!/usr/bin/env python3
 # documentation: libraries https://github.com/ranaroussi/yfinance
 import hashlib
-from typing import TypedDict
+from datetime import date, timedelta
+from operator import attrgetter, itemgetter
+from typing import TypedDict, cast
 import pandas as pd
 
 import json
+from json.encoder import encode_basestring_ascii
+from logging import getLogger
 import os
-import matplotlib.pyplot as plt
+from pathlib import Path
 import requests
-import yfinance as yf
 
-from tickerConverter import CSVDataManager
+from tickerConverter import CSVDataManager, fetch_price_history
+from tickerSession import SESSION, TIMEOUT
+
+# These methods run on main.py's fetch threads, so messages go through logging (and its
+# queue listener) instead of print; progress notes are DEBUG, formatted only when enabled
+log = getLogger(__name__)
+# FMP trade fields copied onto each tickerInfo, in __init__ assignment order
+_TRADE_FIELDS = (
+    'symbol', 'disclosureDate', 'transactionDate', 'firstName', 'lastName',
+    'office', 'district', 'owner', 'assetDescription', 'assetType', 'type',
+    'amount', 'capitalGainsOver200USD', 'comment', 'link',
+)
+# One C-level call pulls every field; the defaults cover fields FMP left out
+_TRADE_DEFAULTS = dict.fromkeys(_TRADE_FIELDS)
+_get_trade_fields = itemgetter(*_TRADE_FIELDS)
+# Pricing starts this long before the disclosure (or transaction) date
+_PRICE_LOOKBACK = timedelta(days=60)
+# Fields that identify a unique trade (the record_hash inputs)
+HASH_FIELDS = ('symbol', 'transactionDate', 'firstName', 'lastName', 'type', 'amount', 'owner', 'assetType')
+# The hash input is exactly what json.dumps(fields, sort_keys=True) prints, filled
+# into a prebuilt template so no dict is built or sorted per trade
+_HASH_KEYS = tuple(sorted(HASH_FIELDS))
+_HASH_TEMPLATE = "{" + ", ".join(f'"{key}": %s' for key in _HASH_KEYS) + "}"
+_get_hash_fields = attrgetter(*_HASH_KEYS)
+# Every graph is drawn on the same figure, cleared between tickers
+_GRAPH_FIGURE = 'tickerGraph'
+# The only price columns a graph reads (an Index, which is what the pandas stubs accept for usecols)
+_GRAPH_COLUMNS = pd.Index(['Date', 'Close'])
+
+def _parse_date(value):
+    """An FMP ISO date string as a date, None when missing or malformed"""
+    try:
+        return date.fromisoformat(value) if value else None
+    except (TypeError, ValueError):
+        return None
+
+def _json_value(value):
+    """A value as json.dumps would print it (strings take the C escaper directly)"""
+    if value.__class__ is str:
+        return encode_basestring_ascii(value)
+    return json.dumps(value)
 
 class tickerInfo:
+    # Fixed attribute layout: no per-instance __dict__ for the hundreds of trades in a batch
+    __slots__ = _TRADE_FIELDS + ('isDataValid', 'priceData', 'optionsData', '_disclosure_dt', '_transaction_dt')
+
     # Shared CSV manager for all tickerInfo instances
     csv_manager = CSVDataManager()
 
     def __init__(self, data : dict):
-        self.symbol=data.get('symbol')
-        self.disclosureDate=data.get('disclosureDate')
-        self.transactionDate=data.get('transactionDate')
-        self.firstName=data.get('firstName')
-        self.lastName=data.get('lastName')
-        self.office=data.get('office')
-        self.district=data.get('district')
-        self.owner=data.get('owner')
-        self.assetDescription=data.get('assetDescription')
-        self.assetType=data.get('assetType')
-        self.type=data.get('type')
-        self.amount=data.get('amount')
-        self.capitalGainsOver200USD=data.get('capitalGainsOver200USD')
-        self.comment=data.get('comment')
-        self.link=data.get('link')
+        (self.symbol, self.disclosureDate, self.transactionDate, self.firstName, self.lastName,
+         self.office, self.district, self.owner, self.assetDescription, self.assetType, self.type,
+         self.amount, self.capitalGainsOver200USD, self.comment, self.link) = _get_trade_fields({**_TRADE_DEFAULTS, **data})
+        # Parsed once here; the price window, options query and graphs all reuse them
+        self._disclosure_dt = _parse_date(self.disclosureDate)
+        self._transaction_dt = _parse_date(self.transactionDate)
         self.isDataValid=None
         self.priceData: pd.DataFrame | None = None
         self.optionsData: pd.DataFrame | None = None
 
-    def getPriceData(self):
-        """get price data for ticker"""
+    @classmethod
+    def from_records(cls, records):
+        """Build a tickerInfo for every FMP trade record"""
+        return [cls(record) for record in records]
+
+    def getPriceWindow(self):
+        """get the (start, end) window pricing is downloaded for"""
         if self.symbol is None:
             raise Exception("Symbol is None")
-        if self.disclosureDate is None or self.transactionDate is None:
+        if self._disclosure_dt is None or self._transaction_dt is None:
             raise Exception("Disclosure date or transaction date is None")
 
-        start_dt = pd.to_datetime(self.disclosureDate) - pd.Timedelta(days=60)
-        transaction_dt = pd.to_datetime(self.transactionDate)
+        start_dt = self._disclosure_dt - _PRICE_LOOKBACK
+        transaction_dt = self._transaction_dt
         if start_dt > transaction_dt:
-            if self.symbol is None:
-                raise Exception("Symbol is None")
-            start_dt = transaction_dt - pd.Timedelta(days=60)
-            print("Extended the range for ticker symbol: "+ self.symbol)
-        start = start_dt.strftime('%Y-%m-%d')
-        end=None
+            start_dt = transaction_dt - _PRICE_LOOKBACK
+            log.debug("Extended the range for ticker symbol: %s", self.symbol)
+        return start_dt, transaction_dt
+
+    def getPriceData(self):
+        """get price data for ticker, unless it was already prefetched by the collection"""
+        if self.priceData is not None:
+            return
+        start_dt, transaction_dt = self.getPriceWindow()
+        start = start_dt.isoformat()
+        end = transaction_dt.isoformat()
         try:
-            data = yf.download(self.symbol, start=start_dt, end=transaction_dt, progress=False, timeout=15)
-            # Flatten MultiIndex columns if present (yfinance returns MultiIndex for single ticker)
-            if isinstance(data.columns, pd.MultiIndex):
-                data.columns = data.columns.get_level_values(0)
-            self.priceData = data
+            self.priceData = fetch_price_history(self.symbol, start, end, timeout=15)
             # self.priceData = self.csv_manager.download_price_data(self.symbol, start, end, None)
-            # print(self.priceData)
         except requests.exceptions.Timeout:
             raise Exception(f"Price data request for {self.symbol} timed out after 15 seconds")
         except requests.exceptions.RequestException as e:
             raise Exception(f"Price data request for {self.symbol} failed: {str(e)}")
         except Exception as e:
-            print(f"Error for {self.symbol}: {e}")
+            log.error("Error for %s: %s", self.symbol, e)
             self.isDataValid=False
 
     def generateGraphs(self, csv_data):
         """generate png graphs for all tickers""" 
         if self.symbol is None:
             raise Exception("Symbol is None")
-        if self.disclosureDate is None or self.transactionDate is None:
+        if self._disclosure_dt is None or self._transaction_dt is None:
             raise Exception("Disclosure date or transaction date is None")  
         if csv_data is not None:
-            print(f"Generating graphs for {self.symbol}")
-            # Ensure graphs directory exists using csv_manager
-            self.csv_manager._ensure_dir(self.csv_manager.graphs_dir)
-
-            df = pd.read_csv(csv_data)
-            df['Date'] = pd.to_datetime(df['Date'])
-            df.set_index('Date', inplace=True)
-            # ax = df['Close'].plot(figsize=(20,10), label='Close Price')
-            transaction_dt = pd.to_datetime(self.transactionDate)
-            plt.axvline(x=transaction_dt, color='red', linestyle='--', linewidth=2,
-                       label=f'Transaction Date ({self.transactionDate})')
-            disclosure_dt = pd.to_datetime(self.disclosureDate)
-            plt.axvline(x=disclosure_dt, color='green', linestyle='--', linewidth=2,
-                       label=f'Disclosure Date ({self.disclosureDate})')
-            plt.xlabel('Date')
-            plt.ylabel('Close Price')
-            politician_name = f'{self.firstName} {self.lastName}'
-            plt.title(f'{self.symbol} - {politician_name} - {self.type}')
-            plt.legend()
-
-            graph_path = self.csv_manager.graphs_dir / f'{self.symbol}.png'
-            plt.savefig(graph_path)
-            plt.close() 
+            # One PNG per trade (several trades can share a symbol); skip it when it is
+            # already newer than the pricing file it was drawn from
+            graph_path = self.csv_manager._ensure_dir(self.csv_manager.graphs_dir) / f'{self.symbol}_{self.record_hash[:12]}.png'
+            if isinstance(csv_data, (str, Path)) and graph_path.exists() \
+                    and graph_path.stat().st_mtime >= Path(csv_data).stat().st_mtime:
+                log.debug("Graph for %s is up to date: %s", self.symbol, graph_path)
+                return
+            log.debug("Generating graphs for %s", self.symbol)
+            # Imported here so runs that never graph skip matplotlib's import and font cache
+            import matplotlib
+            # Headless PNG rendering only: skip GUI backend discovery and setup
+            matplotlib.use('Agg')
+            import matplotlib.pyplot as plt
+            # One module-wide figure/axes pair, cleared after each save, drawn through the OO API
+            fig = plt.figure(_GRAPH_FIGURE)
+            ax = fig.gca()
+            # Clear even when reading, drawing or saving fails, so this trade's lines never
+            # end up in the next trade's PNG on the shared figure
+            try:
+                # Arrow's multithreaded reader parses the dates in the same pass; the plot only needs Close
+                df = pd.read_csv(csv_data, engine='pyarrow', usecols=_GRAPH_COLUMNS,
+                                 parse_dates=['Date'], index_col='Date')
+                ax.plot(df.index, df['Close'], label='Close Price')
+                # matplotlib converts dates through its units registry; its annotations
+                # only admit float, hence the casts
+                ax.axvline(x=cast(float, self._transaction_dt), color='red', linestyle='--', linewidth=2,
+                           label=f'Transaction Date ({self.transactionDate})')
+                ax.axvline(x=cast(float, self._disclosure_dt), color='green', linestyle='--', linewidth=2,
+                           label=f'Disclosure Date ({self.disclosureDate})')
+                ax.set_xlabel('Date')
+                ax.set_ylabel('Close Price')
+                politician_name = f'{self.firstName} {self.lastName}'
+                ax.set_title(f'{self.symbol} - {politician_name} - {self.type}')
+                ax.legend()
+
+                # Fast deflate: a few percent bigger PNGs for a fraction of the encode time
+                fig.savefig(graph_path, pil_kwargs={'compress_level': 1})
+            finally:
+                ax.clear()
 
 
     def getOptionsData(self):
@@ -105,24 +163,25 @@ class tickerInfo:
         url = "https://api.marketdata.app/v1/options/chain/"
         if self.symbol is None:
             raise Exception("Symbol is None")
-        if self.disclosureDate is None or self.transactionDate is None:
+        if self._disclosure_dt is None or self._transaction_dt is None:
             raise Exception("Disclosure date or transaction date is None")  
         full_url = url + self.symbol + "/"
-        # disclosure_dt = pd.to_datetime(self.disclosureDate)
-        transaction_dt = pd.to_datetime(self.transactionDate)
+        # isoformat() is already the API's YYYY-MM-DD; the transaction day is formatted once
+        day = self._transaction_dt.isoformat()
         headers = {
             'Authorization': f'Bearer {os.getenv("MARKETDATA_API_KEY")}'
         }
         # Get options available on transaction date, expiring within next 60 days
         params = {
-            "date": transaction_dt.strftime('%Y-%m-%d'),           # Options chain snapshot from transaction date
-            "from": transaction_dt.strftime('%Y-%m-%d'),           # Expiring from transaction date onwards
-            "to": (transaction_dt + pd.Timedelta(days=60)).strftime('%Y-%m-%d')  # Up to 60 days after transaction
+            "date": day,           # Options chain snapshot from transaction date
+            "from": day,           # Expiring from transaction date onwards
+            "to": (self._transaction_dt + timedelta(days=60)).isoformat()  # Up to 60 days after transaction
         }
         try:
-            response = requests.get(full_url, headers=headers, params=params, timeout=15)
+            # Shared session: keep-alive TLS connections and retries on 429/5xx
+            response = SESSION.get(full_url, headers=headers, params=params, timeout=TIMEOUT)
         except requests.exceptions.Timeout:
-            raise Exception(f"Options request for {self.symbol} timed out after 15 seconds")
+            raise Exception(f"Options request for {self.symbol} timed out after {TIMEOUT[1]} seconds")
         except requests.exceptions.RequestException as e:
             raise Exception(f"Options request for {self.symbol} failed: {str(e)}")
 
@@ -131,30 +190,26 @@ class tickerInfo:
             df = pd.DataFrame(response_data)
             # options_csv_path = self.csv_manager.save_options_data(self.symbol, response_data)
             # self.optionsData = options_csv_path
-            # print(f"Options data saved for {self.symbol} at {options_csv_path}")
+            # log.debug("Options data saved for %s at %s", self.symbol, options_csv_path)
             self.optionsData = df
             # return df
         except Exception as e:
-            print(f"Error saving options data for {self.symbol}: {e}")
+            log.error("Error saving options data for %s: %s", self.symbol, e)
             self.isDataValid=False
             self.optionsData = None
 
     @property
-    def record_hash(self):
+    def record_digest(self):
         """
         Compute SHA256 hash of core trade fields.
         Only hash fields that identify a unique trade.
+        Raw 32-byte digest, the form the database stores.
         """
-        hash_dict = {
-            'symbol': self.symbol,
-            'transactionDate': self.transactionDate,
-            'firstName': self.firstName,
-            'lastName': self.lastName,
-            'type': self.type,
-            'amount': self.amount,
-            'owner': self.owner,
-            'assetType': self.assetType,
-        }
-        # Sort keys for consistent hashing
-        hash_string = json.dumps(hash_dict, sort_keys=True)
-        return hashlib.sha256(hash_string.encode()).hexdigest()
+        # Sorted-key JSON, byte-identical to json.dumps(sort_keys=True) so stored hashes still match
+        hash_string = _HASH_TEMPLATE % tuple(map(_json_value, _get_hash_fields(self)))
+        return hashlib.sha256(hash_string.encode()).digest()
+
+    @property
+    def record_hash(self):
+        """Hex form of record_digest, for logs and lookups"""
+        return self.record_digest.hex()
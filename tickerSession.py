@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""Shared requests.Session so every API call reuses pooled keep-alive connections"""
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+
+# Transient failures (dropped connections, rate limits, 5xx from the API) are retried
+# here with exponential backoff, so callers only see errors that outlasted every retry
+RETRY = Retry(
+    total=5,
+    backoff_factor=0.5,
+    status_forcelist=[429, 500, 502, 503, 504],
+    allowed_methods=["GET"]
+)
+# (connect, read) seconds: fail fast on unreachable hosts, allow slow responses
+TIMEOUT = (3.05, 15)
+
+
+def build_session() -> requests.Session:
+    """Create a session whose HTTPS pool keeps TLS connections open between requests"""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=16,
+        max_retries=RETRY
+    )
+    session.mount("https://", adapter)
+    return session
+
+
+# One session per process, shared by all API clients
+SESSION = build_session()